@@ -46,6 +46,9 @@ class CommandManager:
         self.data_file = external_path
         self._lock = threading.Lock()
         
+        # Serialized JSON of the last successful save (skips no-op rewrites)
+        self._last_saved_json: Optional[str] = None
+        
         # Load data
         self.data = self._load_data()
         
@@ -115,12 +118,19 @@ class CommandManager:
                     # FIX #3: Filter data to prevent contamination
                     filtered_data = self._filter_save_data(self.data)
                     
+                    # CRITICAL: ensure_ascii=False for Unicode support
+                    serialized = json.dumps(filtered_data, indent=2, ensure_ascii=False)
+                    
+                    # Nothing changed since the last save (e.g. shutdown flush):
+                    # skip the temp write and backup rotation entirely
+                    if serialized == self._last_saved_json:
+                        return
+                    
                     # ENHANCED: Use atomic write pattern (write to temp, then rename)
                     temp_file = f"{self.data_file}.tmp"
                     
                     with open(temp_file, 'w', encoding='utf-8', errors='replace') as f:
-                        # CRITICAL: ensure_ascii=False for Unicode support
-                        json.dump(filtered_data, f, indent=2, ensure_ascii=False)
+                        f.write(serialized)
                     
                     # Atomic replace (on Windows, need to remove first)
                     if os.path.exists(self.data_file):
@@ -134,6 +144,7 @@ class CommandManager:
                             pass
                     
                     os.rename(temp_file, self.data_file)
+                    self._last_saved_json = serialized
                     
             except Exception as e:
                 print(f"[CommandMgr] Save error: {e}")
@@ -16,9 +16,30 @@ import queue
 import time
 import json
 import sys
+import os
+import re
+import hashlib
+from collections import OrderedDict, deque
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, Optional, Set, Tuple
 import traceback
+from functools import lru_cache
+
+# winsound is Windows-only; without it the WAV cache is disabled and every
+# utterance goes straight to SAPI
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
+# pywin32 is imported once here rather than inside the worker/recovery path
+try:
+    import pythoncom
+    import win32com.client
+    _HAS_PYWIN32 = True
+except ImportError:
+    _HAS_PYWIN32 = False
 
 # TTS Status Messages (FIX #2: Minimized to essential keywords, max 3 words)
 # Removed redundant messages like "Processing" to reduce latency
@@ -34,6 +55,156 @@ TTS_MESSAGES = {
     "error": "Error"
 }
 
+class _DropTable(dict):
+    """
+    str.translate table that deletes every codepoint it does not map.
+    Unknown codepoints are memoized on first sight, so later lookups for the
+    same character stay in C.
+    """
+    
+    def __missing__(self, codepoint: int):
+        self[codepoint] = None
+        return None
+
+
+def _build_drop_table(limit: int, punctuation: str) -> _DropTable:
+    """Keep alphanumerics below `limit` plus `punctuation`, delete the rest"""
+    table = _DropTable()
+    for codepoint in range(limit):
+        char = chr(codepoint)
+        if char.isalnum() or char in punctuation:
+            table[codepoint] = codepoint
+    return table
+
+
+# Unicode mode transliteration: common Chinese phrases (you can expand this)
+# are replaced in one regex pass, punctuation is normalized per codepoint
+_PHRASE_MAP = {
+    '打开': 'open',
+    '关闭': 'close',
+    '播放': 'play',
+    '停止': 'stop',
+}
+_PHRASE_RE = re.compile('|'.join(map(re.escape, _PHRASE_MAP)))
+_PUNCT_MAP = {
+    0x201C: '"',    # left double quotation mark
+    0x201D: '"',    # right double quotation mark
+    0x2018: "'",    # left single quotation mark
+    0x2019: "'",    # right single quotation mark
+    0x2026: '...',  # horizontal ellipsis
+    0x2014: '-',    # em dash
+    0x2013: '-',    # en dash
+}
+
+# Characters _clean_text keeps: Latin-1 alphanumerics plus basic punctuation in
+# unicode mode (with _PUNCT_MAP folded into the same table), ASCII
+# alphanumerics plus a smaller set in strict mode. Each filter is a single
+# str.translate call instead of a per-character loop.
+_UNICODE_CLEAN_TABLE = _build_drop_table(256, ' .,!?-\'":;()')
+_UNICODE_CLEAN_TABLE.update(_PUNCT_MAP)
+_STRICT_CLEAN_TABLE = _build_drop_table(128, ' .,!?-')
+_WS_RE = re.compile(r'\s+')
+
+# Voice-name keywords for _detect_gender (substring match, case-insensitive)
+_MALE_RE = re.compile(r'david|mark|ryan|male|man|george|james', re.I)
+_FEMALE_RE = re.compile(r'zira|hazel|female|eva|woman|susan|helen', re.I)
+
+@lru_cache(maxsize=256)
+def _clean_text_cached(text: str, max_len: int, unicode_support: bool) -> str:
+    """
+    Enhanced text cleaning with Unicode support.
+    Converts non-ASCII characters intelligently instead of dropping them.
+    Pure in its arguments, so the small, heavily repeated set of status and
+    command phrases is cleaned once and then served from the LRU cache.
+    """
+    if not text:
+        return ""
+    
+    # Limit length (the ellipsis is appended once, after cleaning)
+    truncated = len(text) > max_len
+    text = text[:max_len]
+    
+    clean_table = _UNICODE_CLEAN_TABLE if unicode_support else _STRICT_CLEAN_TABLE
+    
+    if text.isascii():
+        # Fast path for the common case (status messages, English commands):
+        # nothing to transliterate, and plain words need no filtering either
+        if text.replace(' ', '').isalnum():
+            clean = text
+        else:
+            clean = text.translate(clean_table)
+    else:
+        if unicode_support:
+            # Smart Unicode handling - transliterate common phrases; punctuation
+            # normalization happens in the translate pass below
+            text = _PHRASE_RE.sub(lambda m: _PHRASE_MAP[m.group(0)], text)
+    
+        # Try to keep alphanumeric and basic punctuation
+        # Allow extended ASCII for better compatibility (strict mode: ASCII only)
+        clean = text.translate(clean_table)
+    
+    # Clean whitespace
+    clean = _WS_RE.sub(' ', clean).strip()
+    if truncated:
+        clean += "..."
+    
+    return clean if len(clean) > 0 else ""
+
+
+class TaskRing:
+    """
+    Bounded FIFO between speak_text() callers and the single TTS worker.
+    
+    deque.append/popleft are atomic under the GIL, so producers never take a
+    lock; the consumer parks on one Event only when the ring is empty.
+    Replaces queue.Queue, whose put/get each pay a mutex plus condition signal.
+    """
+    
+    __slots__ = ("maxsize", "_buf", "_not_empty")
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._buf = deque()
+        self._not_empty = threading.Event()
+    
+    def push(self, item) -> bool:
+        """Append item, returns False if the ring is full"""
+        if len(self._buf) >= self.maxsize:
+            return False
+        self._buf.append(item)
+        # Always signal: with several producers, a length read before the
+        # append can be stale by the time the consumer parks, so an
+        # "only on empty -> non-empty" wakeup could be lost
+        self._not_empty.set()
+        return True
+    
+    def pop(self, timeout: float):
+        """Remove and return the oldest item, raises queue.Empty after timeout"""
+        try:
+            return self._buf.popleft()
+        except IndexError:
+            pass
+        
+        self._not_empty.clear()
+        # Re-check after clearing so a push racing with clear() is not lost
+        if not self._buf and not self._not_empty.wait(timeout):
+            raise queue.Empty
+        
+        try:
+            return self._buf.popleft()
+        except IndexError:
+            raise queue.Empty
+    
+    def clear(self) -> int:
+        """Drop all pending items, returns how many were dropped"""
+        dropped = len(self._buf)
+        self._buf.clear()
+        return dropped
+    
+    def qsize(self) -> int:
+        return len(self._buf)
+
+
 class TTSEngine:
     """
     Enhanced Windows System TTS engine with proper lifecycle management.
@@ -53,22 +224,60 @@ class TTSEngine:
         
         # Configuration
         self.config = self._load_config()
+        self._refresh_config_attrs()
+        self._config_dirty = threading.Event()
+        self._config_saver_thread = None
+        self._save_delay = 0.5  # seconds, coalesces slider-driven changes
+        
+        # Status prompts are constant: limit and clean them once up front so
+        # speak_status() and the worker never re-clean them
+        self._clean_status_cache = {
+            status: self._clean_text(self._limit_to_five_words(message))
+            for status, message in TTS_MESSAGES.items()
+        }
         
         # TTS engine state
         self.engine = None
         self.available_voices = []
+        self._voices_snapshot: Tuple[Mapping[str, Any], ...] = ()
+        self._voice_items = []  # SAPI voice tokens, fetched once per engine
         self.current_voice_index = 0
         
         # Thread management (non-daemon)
-        self.tts_queue = queue.Queue(maxsize=20)
+        self.tts_queue = TaskRing(maxsize=32)
         self.is_running = False
         self.worker_thread = None
         self.shutdown_event = threading.Event()
-        self._engine_lock = threading.RLock()
+        # Plain (non-reentrant) lock around COM calls on the engine only;
+        # reads of self.engine itself are lock-free (attribute publication is
+        # atomic). Helpers documented as "caller holds _engine_lock" must not
+        # take it again.
+        self._engine_lock = threading.Lock()
+        
+        # TTS_DEBUG=1 enables full tracebacks (costly in retry loops) and the
+        # chatty per-thread lifecycle lines (COM init, queue cleared, ...)
+        self._debug = os.environ.get("TTS_DEBUG") == "1"
         
         # Performance tracking
         self._speaking = False
-        self._queue_stats = {"processed": 0, "dropped": 0, "errors": 0}
+        self._n_processed = 0
+        self._n_dropped = 0
+        self._n_errors = 0
+        
+        # Messages queued while speaking are folded into one SAPI utterance
+        self._batch_max_items = 4
+        self._batch_max_chars = 800
+        
+        # Duplicate suppression for repeated prompts (e.g. "listening")
+        self._last_enqueued: Optional[str] = None
+        self._last_enqueued_time = 0.0
+        self._current_texts: Set[str] = set()  # every message in the utterance being spoken
+        self._dedup_window = 2.0  # seconds
+        
+        # Set by priority messages to cut a normal utterance short; speech that
+        # is itself a priority status is never preempted
+        self._preempt = threading.Event()
+        self._current_priority = False
         
         # TTS-STT synchronization (FIX #1)
         self._completion_event = threading.Event()
@@ -81,6 +290,21 @@ class TTSEngine:
         self._last_reinit_time = 0
         self._reinit_cooldown = 5.0  # seconds
         
+        # Rendered-utterance WAV cache (LRU, keyed by text + voice settings)
+        self._cache_dir = self.config_file.parent / "tts_cache"
+        self._cache_index_file = self.config_file.parent / "tts_cache_index.json"
+        self._cache_max_entries = 128
+        self._cache_max_bytes = 20 * 1024 * 1024
+        self._cache_ttl = 30 * 24 * 3600  # seconds
+        self._cache_bytes = 0
+        # The cache directory and index are only touched when playback is possible
+        if winsound is not None and self._audio_cache_enabled:
+            self._audio_cache = self._load_cache_index()
+        else:
+            self._audio_cache = OrderedDict()
+        self._pending_renders: "OrderedDict[str, None]" = OrderedDict()
+        self._max_pending_renders = 16
+        
         # Initialize engine (lazy initialization in worker thread)
         print("[TTS] TTSEngine initialized")
     
@@ -93,7 +317,8 @@ class TTSEngine:
             "enabled": True,
             "queue_timeout": 0.5,  # Shorter timeout for responsiveness
             "max_text_length": 300,  # Increased for better message support
-            "unicode_support": True  # Enable unicode character handling
+            "unicode_support": True,  # Enable unicode character handling
+            "audio_cache": True  # Replay repeated utterances from rendered WAVs
         }
         
         if self.config_file.exists():
@@ -107,48 +332,277 @@ class TTSEngine:
         
         return default_config
     
+    def _refresh_config_attrs(self):
+        """
+        Mirror config values read on every utterance into plain attributes,
+        so the worker does not pay a dict lookup per read. Call again after
+        changing any of these keys in self.config.
+        """
+        self._enabled = self.config.get("enabled", True)
+        self._queue_timeout = self.config.get("queue_timeout", 0.5)
+        self._max_text_length = self.config.get("max_text_length", 300)
+        self._unicode_support = self.config.get("unicode_support", True)
+        self._audio_cache_enabled = self.config.get("audio_cache", True)
+    
     def _save_config(self):
-        """Save configuration asynchronously with proper error handling"""
-        def _save():
+        """Request a config save (O(1): the saver thread does the write)"""
+        self._config_dirty.set()
+    
+    def _write_config(self):
+        """Write configuration to disk with proper error handling"""
+        try:
+            with open(self.config_file, 'w', encoding='utf-8') as f:
+                json.dump(self.config, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"[TTS] Config save error: {e}")
+    
+    def _config_saver_loop(self):
+        """
+        Single long-lived config writer. A burst of setter calls (e.g. a rate
+        slider drag) is left to settle briefly and then written once.
+        """
+        while not self.shutdown_event.is_set():
+            if not self._config_dirty.wait(timeout=1.0):
+                continue
+            self.shutdown_event.wait(self._save_delay)
+            self._config_dirty.clear()
+            self._write_config()
+        
+        # Flush a change made just before shutdown
+        if self._config_dirty.is_set():
+            self._config_dirty.clear()
+            self._write_config()
+    
+    def _load_cache_index(self) -> "OrderedDict[str, Dict[str, Any]]":
+        """
+        Load the persisted WAV cache index so prompts rendered in a previous
+        run replay without resynthesis. Entries whose file is gone or older
+        than the TTL are dropped, then the size cap is applied (LRU first).
+        """
+        index = OrderedDict()
+        if self._cache_index_file.exists():
             try:
-                with open(self.config_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.config, f, indent=2, ensure_ascii=False)
+                with open(self._cache_index_file, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                
+                now = time.time()
+                for key, entry in loaded.items():
+                    if not isinstance(entry, dict):
+                        continue
+                    path = entry.get("path", "")
+                    try:
+                        size = os.stat(path).st_size
+                    except OSError:
+                        continue
+                    if now - entry.get("ts", 0) > self._cache_ttl:
+                        self._remove_cache_file(path)
+                        continue
+                    index[key] = {"path": path, "size": size, "ts": entry.get("ts", now)}
+                    self._cache_bytes += size
             except Exception as e:
-                print(f"[TTS] Config save error: {e}")
+                print(f"[TTS] Cache index load error: {e}")
         
-        # Save in background daemon thread (non-critical operation)
-        threading.Thread(target=_save, daemon=True, name="TTS-ConfigSave").start()
+        self._evict_cache(index)
+        
+        # Remove renders orphaned by a run that never saved its index
+        if self._cache_dir.is_dir():
+            known = {entry["path"] for entry in index.values()}
+            with os.scandir(self._cache_dir) as it:
+                for dir_entry in it:
+                    if dir_entry.name.endswith(".wav") and str(Path(dir_entry.path).resolve()) not in known:
+                        self._remove_cache_file(dir_entry.path)
+        return index
+    
+    def _evict_cache(self, index: "OrderedDict[str, Dict[str, Any]]"):
+        """Drop least recently used renders until count and size caps hold"""
+        while index and (len(index) > self._cache_max_entries
+                         or self._cache_bytes > self._cache_max_bytes):
+            _, entry = index.popitem(last=False)
+            self._cache_bytes -= entry["size"]
+            self._remove_cache_file(entry["path"])
+    
+    @staticmethod
+    def _remove_cache_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    
+    def _save_cache_index(self):
+        """Persist the WAV cache index (LRU order is preserved)"""
+        try:
+            with open(self._cache_index_file, 'w', encoding='utf-8') as f:
+                json.dump(dict(self._audio_cache), f, indent=2)
+        except Exception as e:
+            print(f"[TTS] Cache index save error: {e}")
+    
+    def _cache_key(self, text: str) -> str:
+        """Cache key covering everything that changes the rendered audio"""
+        key_source = (
+            f"{text}|{self.config.get('rate', 0)}|"
+            f"{self.config.get('volume', 100)}|{self.current_voice_index}"
+        )
+        return hashlib.blake2b(key_source.encode('utf-8')).hexdigest()[:16]
+    
+    def _render_to_wav(self, text: str, key: str) -> Optional[str]:
+        """
+        Render text to a WAV file by pointing the engine at a SAPI.SpFileStream.
+        Caller must hold _engine_lock. Returns the file path, or None on failure.
+        If the live audio output cannot be restored afterwards, self.engine is
+        dropped so the caller can rebuild it.
+        The render is asynchronous and is abandoned (returning None) as soon as
+        a message is queued, a priority message preempts, or shutdown starts.
+        """
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            path = str((self._cache_dir / f"{key}.wav").resolve())
+            
+            audio_format = win32com.client.Dispatch("SAPI.SpAudioFormat")
+            audio_format.Type = 22  # SAFT22kHz16BitMono
+            stream = win32com.client.Dispatch("SAPI.SpFileStream")
+            stream.Format = audio_format
+            stream.Open(path, 3)  # 3 = SSFMCreateForWrite
+            
+            original_output = self.engine.AudioOutputStream
+            aborted = False
+            self._preempt.clear()
+            try:
+                self.engine.AudioOutputStream = stream
+                self.engine.Speak(text, 1)  # 1 = SVSFlagsAsync
+                while not self.engine.WaitUntilDone(50):
+                    if (self.shutdown_event.is_set() or self._preempt.is_set()
+                            or self.tts_queue.qsize()):
+                        # 1 | 2 = SVSFlagsAsync | SVSFPurgeBeforeSpeak; let the
+                        # purge settle before the output stream is swapped back
+                        self.engine.Speak("", 1 | 2)
+                        self.engine.WaitUntilDone(1000)
+                        aborted = True
+                        break
+            finally:
+                # Restore live output before closing the file stream; a voice
+                # left bound to a closed stream would fail every later Speak
+                try:
+                    self.engine.AudioOutputStream = original_output
+                except Exception as e:
+                    print(f"[TTS] Audio output restore failed, dropping engine: {e}")
+                    self.engine = None
+                stream.Close()
+            if aborted:
+                # Partial file; _render_pending re-queues the text
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                return None
+            return path if self.engine else None
+        except Exception as e:
+            print(f"[TTS] Cache render error: {e}")
+            return None
+    
+    def _speak_cached(self, text: str) -> bool:
+        """
+        Play text from the WAV cache.
+        On a miss the text is queued for rendering while the worker is idle and
+        False is returned, so the caller speaks it live without waiting for a
+        full render first. Caller must hold _engine_lock.
+        """
+        if winsound is None or not self._audio_cache_enabled:
+            return False
+        
+        key = self._cache_key(text)
+        entry = self._audio_cache.get(key)
+        if entry is None:
+            self._pending_renders[text] = None
+            while len(self._pending_renders) > self._max_pending_renders:
+                self._pending_renders.popitem(last=False)
+            return False
+        
+        # No existence check here: files were stat()ed when the index was
+        # loaded, and a file deleted since then just fails playback below
+        self._audio_cache.move_to_end(key)
+        entry["ts"] = time.time()
+        try:
+            winsound.PlaySound(entry["path"], winsound.SND_FILENAME | winsound.SND_NODEFAULT)
+            return True
+        except Exception as e:
+            print(f"[TTS] Cached playback error: {e}")
+            self._audio_cache.pop(key, None)
+            self._cache_bytes -= entry["size"]
+            return False
+    
+    def _render_pending(self):
+        """Render one cache miss to WAV (called from the worker when idle)"""
+        if not self._pending_renders or not self.engine:
+            return
+        
+        # Speech takes precedence: only render while nothing is waiting
+        if self.tts_queue.qsize() or self.shutdown_event.is_set():
+            return
+        
+        text, _ = self._pending_renders.popitem(last=False)
+        # Key on the current settings, they may have changed since the miss
+        key = self._cache_key(text)
+        with self._engine_lock:
+            path = self._render_to_wav(text, key)
+        if self.engine is None:
+            # The render could not hand the voice back to live output
+            self._init_engine()
+        if path is None:
+            if self.tts_queue.qsize() and not self.shutdown_event.is_set():
+                # Interrupted by new speech: retry this one first next time
+                self._pending_renders[text] = None
+                self._pending_renders.move_to_end(text, last=False)
+            return
+        
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        
+        old_entry = self._audio_cache.pop(key, None)
+        if old_entry is not None:
+            self._cache_bytes -= old_entry["size"]
+        self._audio_cache[key] = {"path": path, "size": size, "ts": time.time()}
+        self._cache_bytes += size
+        self._evict_cache(self._audio_cache)
     
     def _init_engine(self) -> bool:
         """
         Initialize Windows SAPI TTS engine with proper COM initialization.
         Must be called from the worker thread for proper COM apartment threading.
         """
+        if not _HAS_PYWIN32:
+            print("[TTS] CRITICAL: pywin32 not available")
+            print("[TTS] Install with: pip install pywin32")
+            return False
+        
         try:
             # CRITICAL: Initialize COM for this thread
-            import pythoncom
             pythoncom.CoInitialize()
             
-            import win32com.client
-            
             with self._engine_lock:
                 # Create SAPI voice object
                 self.engine = win32com.client.Dispatch("SAPI.SpVoice")
                 
-                # Get available voices
+                # Get available voices (the list cannot change at runtime, so
+                # the tokens are kept for voice switches instead of re-querying)
                 voices = self.engine.GetVoices()
+                self._voice_items = [voices.Item(i) for i in range(voices.Count)]
                 self.available_voices = []
                 
-                for i in range(voices.Count):
-                    voice = voices.Item(i)
+                for i, voice in enumerate(self._voice_items):
+                    description = voice.GetDescription()
                     voice_info = {
                         "index": i,
-                        "name": voice.GetDescription(),
+                        "name": description,
                         "id": voice.Id,
-                        "gender": self._detect_gender(voice.GetDescription())
+                        "gender": self._detect_gender(description)
                     }
                     self.available_voices.append(voice_info)
                 
+                # Read-only view handed out by get_available_voices()
+                self._voices_snapshot = tuple(MappingProxyType(v) for v in self.available_voices)
+                
                 # Apply saved settings
                 self._apply_settings()
                 
@@ -156,71 +610,65 @@ class TTSEngine:
                 self._consecutive_errors = 0  # Reset error counter
                 return True
                 
-        except ImportError as e:
-            print(f"[TTS] CRITICAL: pywin32 not available - {e}")
-            print("[TTS] Install with: pip install pywin32")
-            return False
         except Exception as e:
             print(f"[TTS] Engine initialization error: {e}")
-            traceback.print_exc()
+            if self._debug:
+                traceback.print_exc()
             return False
     
     def _detect_gender(self, name: str) -> str:
         """Simple gender detection from voice name"""
-        name_lower = name.lower()
-        if any(word in name_lower for word in ['david', 'mark', 'ryan', 'male', 'man', 'george', 'james']):
+        if _MALE_RE.search(name):
             return "male"
-        elif any(word in name_lower for word in ['zira', 'hazel', 'female', 'eva', 'woman', 'susan', 'helen']):
+        elif _FEMALE_RE.search(name):
             return "female"
         return "unknown"
     
     def _apply_settings(self):
-        """Apply voice settings to engine"""
+        """Apply voice settings to engine (caller holds _engine_lock)"""
         if not self.engine:
             return
         
         try:
-            with self._engine_lock:
-                # Set voice
-                voice_index = self.config.get("voice_index", 0)
-                if 0 <= voice_index < len(self.available_voices):
-                    voices = self.engine.GetVoices()
-                    if voice_index < voices.Count:
-                        self.engine.Voice = voices.Item(voice_index)
-                        self.current_voice_index = voice_index
-                
-                # Set rate (-10 to 10)
-                rate = max(-10, min(10, self.config.get("rate", 0)))
-                self.engine.Rate = rate
-                
-                # Set volume (0 to 100)
-                volume = max(0, min(100, self.config.get("volume", 100)))
-                self.engine.Volume = volume
+            # Set voice
+            voice_index = self.config.get("voice_index", 0)
+            if 0 <= voice_index < len(self._voice_items):
+                self.engine.Voice = self._voice_items[voice_index]
+                self.current_voice_index = voice_index
+            
+            # Set rate (-10 to 10)
+            rate = max(-10, min(10, self.config.get("rate", 0)))
+            self.engine.Rate = rate
+            
+            # Set volume (0 to 100)
+            volume = max(0, min(100, self.config.get("volume", 100)))
+            self.engine.Volume = volume
             
         except Exception as e:
             print(f"[TTS] Settings apply error: {e}")
     
-    def get_available_voices(self) -> List[Dict[str, Any]]:
-        """Get list of available voices"""
-        return self.available_voices.copy()
+    def get_available_voices(self) -> Tuple[Mapping[str, Any], ...]:
+        """Get available voices (shared read-only snapshot, no copy per call)"""
+        return self._voices_snapshot
     
     def set_voice_by_index(self, voice_index: int) -> bool:
         """Set voice by index"""
         if not self.engine or not (0 <= voice_index < len(self.available_voices)):
             return False
         
+        if voice_index >= len(self._voice_items):
+            return False
+        
         try:
             with self._engine_lock:
-                voices = self.engine.GetVoices()
-                if voice_index < voices.Count:
-                    self.engine.Voice = voices.Item(voice_index)
-                    self.current_voice_index = voice_index
-                    self.config["voice_index"] = voice_index
-                    
-                    # Save config asynchronously
-                    self._save_config()
-                    print(f"[TTS] Voice changed to: {self.available_voices[voice_index]['name']}")
-                    return True
+                self.engine.Voice = self._voice_items[voice_index]
+            self.current_voice_index = voice_index
+            self.config["voice_index"] = voice_index
+            
+            # Save config asynchronously (debounced)
+            self._save_config()
+            print(f"[TTS] Voice changed to: {self.available_voices[voice_index]['name']}")
+            return True
                     
         except Exception as e:
             print(f"[TTS] Voice setting error: {e}")
@@ -236,9 +684,9 @@ class TTSEngine:
             rate = max(-10, min(10, rate))
             with self._engine_lock:
                 self.engine.Rate = rate
-                self.config["rate"] = rate
-                self._save_config()
-                return True
+            self.config["rate"] = rate
+            self._save_config()
+            return True
         except Exception as e:
             print(f"[TTS] Rate setting error: {e}")
             return False
@@ -252,9 +700,9 @@ class TTSEngine:
             volume = max(0, min(100, volume))
             with self._engine_lock:
                 self.engine.Volume = volume
-                self.config["volume"] = volume
-                self._save_config()
-                return True
+            self.config["volume"] = volume
+            self._save_config()
+            return True
         except Exception as e:
             print(f"[TTS] Volume setting error: {e}")
             return False
@@ -289,6 +737,13 @@ class TTSEngine:
             name="TTS-Worker"
         )
         self.worker_thread.start()
+        
+        self._config_saver_thread = threading.Thread(
+            target=self._config_saver_loop,
+            daemon=False,  # Non-daemon so pending config changes are flushed
+            name="TTS-ConfigSave"
+        )
+        self._config_saver_thread.start()
         print("[TTS] Worker thread started")
     
     def stop(self, timeout: float = 5.0):
@@ -306,11 +761,15 @@ class TTSEngine:
         self.shutdown_event.set()
         
         # Clear queue and send shutdown signal
-        try:
-            self.clear_queue()
-            self.tts_queue.put(None, timeout=0.5)
-        except queue.Full:
-            pass
+        self.clear_queue()
+        self.tts_queue.push(None)
+        
+        # Interrupt any ongoing cached playback (does not need the engine lock)
+        if winsound is not None:
+            try:
+                winsound.PlaySound(None, 0)
+            except Exception:
+                pass
         
         # Interrupt any ongoing speech
         try:
@@ -324,35 +783,54 @@ class TTSEngine:
             pass
         
         # Wait for worker thread to finish (non-blocking with timeout)
+        worker_stopped = True
         if self.worker_thread and self.worker_thread.is_alive():
             self.worker_thread.join(timeout=timeout)
             if self.worker_thread.is_alive():
+                worker_stopped = False
                 print("[TTS] WARNING: Worker thread did not stop gracefully")
             else:
                 print("[TTS] Worker thread stopped successfully")
         
         self.worker_thread = None
+        
+        if self._config_saver_thread is not None:
+            self._config_saver_thread.join(timeout=timeout)
+            self._config_saver_thread = None
+        
+        # A worker that is still alive may be mutating the index; skip the save
+        # rather than persist a half-updated snapshot
+        if worker_stopped and winsound is not None and self._audio_cache_enabled:
+            self._save_cache_index()
     
     def _worker_loop(self):
         """
         Enhanced TTS worker loop with proper COM initialization and cleanup.
         This runs in a separate thread with its own COM apartment.
         """
-        print("[TTS] Worker loop starting...")
+        if self._debug:
+            print("[TTS] Worker loop starting...")
+        
+        if not _HAS_PYWIN32:
+            print("[TTS] CRITICAL: pywin32 not available - install with: pip install pywin32")
+            self._completion_event.set()  # Nothing will ever be spoken
+            return
         
         # CRITICAL: Initialize COM for this worker thread
         try:
-            import pythoncom
             pythoncom.CoInitialize()
-            print("[TTS] COM initialized for worker thread")
+            if self._debug:
+                print("[TTS] COM initialized for worker thread")
         except Exception as e:
             print(f"[TTS] CRITICAL: COM initialization failed: {e}")
+            self._completion_event.set()  # Nothing will ever be spoken
             return
         
         # Initialize TTS engine
         if not self._init_engine():
             print("[TTS] CRITICAL: Engine initialization failed")
             pythoncom.CoUninitialize()
+            self._completion_event.set()  # Nothing will ever be spoken
             return
         
         # Main processing loop
@@ -361,51 +839,61 @@ class TTSEngine:
                 try:
                     # Get task with timeout for responsiveness
                     try:
-                        task = self.tts_queue.get(
-                            timeout=self.config.get("queue_timeout", 0.5)
+                        task = self.tts_queue.pop(
+                            timeout=self._queue_timeout
                         )
                     except queue.Empty:
+                        # Idle: drain queued SAPI events (this thread is an
+                        # STA apartment) and render a pending cache miss
+                        self._pump_com()
+                        self._render_pending()
                         continue
                     
                     # Check for shutdown signal
                     if task is None or not self.is_running:
                         break
                     
-                    text = task.get("text", "")
-                    priority = task.get("priority", False)
+                    text, priority, preclean = task
                     
                     if not text:
-                        self.tts_queue.task_done()
+                        self._signal_idle()
                         continue
                     
-                    # Process text
-                    clean_text = self._clean_text(text)
+                    # Process text (status prompts arrive pre-cleaned)
+                    clean_text = text if preclean else self._clean_text(text)
                     if not clean_text:
-                        self.tts_queue.task_done()
+                        self._signal_idle()
                         continue
                     
+                    self._current_priority = priority
+                    self._current_texts = {text}
+                    batch = self._collect_batch(clean_text)
+                    
                     # Speak using Windows SAPI
                     try:
                         with self._engine_lock:
-                            if self.engine and self.config.get("enabled", True):
+                            if self.engine and self._enabled:
                                 # Signal TTS start (FIX #1: TTS-STT synchronization)
                                 self._completion_event.clear()
                                 self._speaking = True
                                 self._speaking_start_time = time.time()
                                 
-                                # Use synchronous speaking for queue processing
-                                self.engine.Speak(clean_text, 0)  # 0 = synchronous
+                                # Replay a single message from the WAV cache, or
+                                # speak live (batches are one-offs and not worth
+                                # rendering)
+                                if len(batch) > 1:
+                                    self._speak_live(self._join_batch(batch))
+                                elif not self._speak_cached(clean_text):
+                                    self._speak_live(clean_text)
                                 
-                                # Signal TTS completion (FIX #1)
                                 self._speaking = False
-                                self._completion_event.set()
                                 
-                                self._queue_stats["processed"] += 1
+                                self._n_processed += len(batch)
                                 self._consecutive_errors = 0  # Reset on success
                                 
                     except Exception as e:
                         print(f"[TTS] Speak error: {e}")
-                        self._queue_stats["errors"] += 1
+                        self._n_errors += 1
                         self._speaking = False
                         self._consecutive_errors += 1
                         
@@ -424,14 +912,17 @@ class TTSEngine:
                                     print(f"[TTS] Reinit failed: {reinit_error}")
                     
                     finally:
-                        try:
-                            self.tts_queue.task_done()
-                        except:
-                            pass
+                        self._current_texts = set()
+                        self._current_priority = False
+                        # Signal TTS completion (FIX #1), unless more is queued
+                        self._signal_idle()
                             
                 except Exception as e:
                     print(f"[TTS] Worker loop error: {e}")
-                    traceback.print_exc()
+                    if self._debug:
+                        traceback.print_exc()
+                    self._speaking = False
+                    self._signal_idle()
                     time.sleep(0.5)
         
         finally:
@@ -449,94 +940,150 @@ class TTSEngine:
                 pass
             
             try:
-                import pythoncom
                 pythoncom.CoUninitialize()
-                print("[TTS] COM uninitialized")
+                if self._debug:
+                    print("[TTS] COM uninitialized")
             except:
                 pass
             
+            self._speaking = False
+            self._completion_event.set()
             print("[TTS] Worker loop ended")
     
-    def _clean_text(self, text: str) -> str:
+    def _speak_live(self, text: str):
         """
-        Enhanced text cleaning with Unicode support.
-        Converts non-ASCII characters intelligently instead of dropping them.
+        Speak through SAPI in async mode and poll for completion, so a
+        shutdown request interrupts long speech within ~50ms instead of
+        waiting for a synchronous Speak() to return. A priority message
+        (speak_status) preempts it the same way. Caller holds _engine_lock.
         """
-        if not text:
-            return ""
-        
-        # Limit length
-        max_len = self.config.get("max_text_length", 300)
-        if len(text) > max_len:
-            text = text[:max_len] + "..."
-        
-        if self.config.get("unicode_support", True):
-            # Smart Unicode handling - transliterate common characters
-            replacements = {
-                # Common Chinese characters (you can expand this)
-                '打开': 'open',
-                '关闭': 'close',
-                '播放': 'play',
-                '停止': 'stop',
-                # Punctuation normalization
-                '"': '"',
-                '"': '"',
-                ''': "'",
-                ''': "'",
-                '…': '...',
-                '—': '-',
-                '–': '-',
-            }
+        self._preempt.clear()
+        self.engine.Speak(text, 1)  # 1 = SVSFlagsAsync
+        while not self.engine.WaitUntilDone(50):
+            if self.shutdown_event.is_set() or self._preempt.is_set():
+                # 1 | 2 = SVSFlagsAsync | SVSFPurgeBeforeSpeak: drop the rest
+                self.engine.Speak("", 1 | 2)
+                break
+        self._pump_com()  # Drain the end-of-stream events of this utterance
+    
+    @staticmethod
+    def _pump_com():
+        """Dispatch pending COM messages for the worker's STA apartment"""
+        try:
+            pythoncom.PumpWaitingMessages()
+        except Exception:
+            pass
+    
+    def _collect_batch(self, first_text: str) -> List[str]:
+        """
+        Pull messages already waiting in the queue so they are spoken in the
+        same SAPI session as first_text (bounded by item count and length).
+        """
+        batch = [first_text]
+        batch_chars = len(first_text)
+        
+        while (len(batch) < self._batch_max_items
+               and batch_chars < self._batch_max_chars
+               and self.tts_queue.qsize()):
+            try:
+                task = self.tts_queue.pop(timeout=0)
+            except queue.Empty:
+                break
             
-            for old, new in replacements.items():
-                text = text.replace(old, new)
+            # Shutdown sentinel: stop collecting, the main loop exits next
+            if task is None:
+                break
             
-            # Try to keep alphanumeric and basic punctuation
-            # Allow extended ASCII for better compatibility
-            clean = ''.join(c for c in text if ord(c) < 256 and (c.isalnum() or c in ' .,!?-\'":;()'))
-        else:
-            # Strict ASCII-only mode
-            clean = ''.join(c for c in text if ord(c) < 128 and (c.isalnum() or c in ' .,!?-'))
-        
-        # Clean whitespace
-        clean = ' '.join(clean.split()).strip()
+            text, priority, preclean = task
+            clean_text = text if preclean else self._clean_text(text)
+            if clean_text:
+                if priority:
+                    self._current_priority = True
+                self._current_texts.add(text)
+                batch.append(clean_text)
+                batch_chars += len(clean_text)
         
-        return clean if len(clean) > 0 else ""
+        return batch
+    
+    @staticmethod
+    def _join_batch(batch: List[str]) -> str:
+        """Join batched messages into one utterance, adding a sentence break
+        only where the previous message does not already end with one"""
+        parts = [batch[0]]
+        for text in batch[1:]:
+            parts.append(" " if parts[-1].endswith(('.', '!', '?')) else ". ")
+            parts.append(text)
+        return "".join(parts)
+    
+    def _clean_text(self, text: str) -> str:
+        """Clean text for SAPI using the current length/unicode settings"""
+        return _clean_text_cached(
+            text,
+            self._max_text_length,
+            self._unicode_support,
+        )
     
     def speak_text(self, text: str, priority: bool = False) -> bool:
         """Queue text for speaking (non-blocking)"""
-        if not self.config.get("enabled", True) or not text:
+        return self._queue_text(text, priority)
+    
+    def _queue_text(self, text: str, priority: bool, preclean: bool = False) -> bool:
+        """Queue text for the worker; preclean=True marks already-cleaned text"""
+        if not self._enabled or not text:
             return False
         
         try:
-            task = {"text": text, "priority": priority}
+            # Tasks are (text, priority, preclean) tuples; None stops the worker
+            task = (text, priority, preclean)
+            
+            # Drop repeats of what is being spoken right now, or (for normal
+            # messages) of what was queued within the last few seconds. This
+            # runs first so a repeated priority status neither clears the
+            # queue nor cuts off the identical utterance already playing.
+            now = time.time()
+            if text in self._current_texts or (
+                not priority
+                and text == self._last_enqueued
+                and now - self._last_enqueued_time < self._dedup_window
+            ):
+                return True
             
             if priority:
-                # Clear queue for high priority
-                try:
-                    while not self.tts_queue.empty():
-                        try:
-                            self.tts_queue.get_nowait()
-                            self.tts_queue.task_done()
-                        except queue.Empty:
-                            break
-                except:
-                    pass
+                # Clear queue for high priority and cut off current normal
+                # speech so the worker picks this up within one completion
+                # poll; a status prompt already playing finishes first
+                self.tts_queue.clear()
+                if self._speaking and not self._current_priority:
+                    self._preempt.set()
+            elif self.tts_queue.qsize() > self.tts_queue.maxsize * 0.75:
+                # Backpressure: shed normal messages before the ring fills up
+                # (e.g. engine stuck), keeping room for priority messages
+                self._n_dropped += 1
+                if self._debug:
+                    print("[TTS] Queue nearly full, message dropped")
+                return False
+            
+            if not self.tts_queue.push(task):
+                self._n_dropped += 1
+                print("[TTS] Queue full, message dropped")
+                return False
+            
+            # Pending speech: wait_for_completion() now blocks until it is
+            # spoken (only if a worker is alive to speak it)
+            if self.worker_thread is not None and self.worker_thread.is_alive():
+                self._completion_event.clear()
             
-            self.tts_queue.put(task, timeout=0.1)
+            self._last_enqueued = text
+            self._last_enqueued_time = now
             return True
             
-        except queue.Full:
-            self._queue_stats["dropped"] += 1
-            print(f"[TTS] Queue full, message dropped")
-            return False
         except Exception as e:
             print(f"[TTS] Queue error: {e}")
             return False
     
     def speak_text_sync(self, text: str) -> bool:
         """Speak text synchronously (blocking) - use sparingly"""
-        if not self.config.get("enabled", True) or not text:
+        if not self._enabled or not text:
             return False
         
         clean_text = self._clean_text(text)
@@ -566,9 +1113,13 @@ class TTSEngine:
     
     def speak_status(self, status: str):
         """Speak status message with priority (limited to 5 words)"""
-        message = TTS_MESSAGES.get(status, status)
-        # Ensure status messages are limited to 5 words
-        message = self._limit_to_five_words(message)
+        message = self._clean_status_cache.get(status)
+        if message is not None:
+            self._queue_text(message, priority=True, preclean=True)
+            return
+        
+        # Unknown status: speak it as given, ensuring the 5-word limit
+        message = self._limit_to_five_words(status)
         self.speak_text(message, priority=True)
     
     def speak_command(self, command: str):
@@ -581,9 +1132,23 @@ class TTSEngine:
         """Check if currently speaking"""
         return self._speaking
     
+    def _signal_idle(self):
+        """
+        Set the completion event once nothing is speaking or queued.
+        speak_text() pushes before clearing the event, so re-checking the
+        queue after set() closes the race with a concurrent push.
+        """
+        if self.tts_queue.qsize():
+            return
+        self._completion_event.set()
+        if self.tts_queue.qsize():
+            self._completion_event.clear()
+    
     def wait_for_completion(self, timeout: float = 5.0) -> bool:
         """
         Wait for TTS to complete speaking (FIX #1: TTS-STT synchronization).
+        Covers messages still queued, not only the one being spoken, so it is
+        safe to call straight after speak_text().
         Returns True if TTS completed, False if timeout occurred.
         """
         return self._completion_event.wait(timeout=timeout)
@@ -608,13 +1173,11 @@ class TTSEngine:
     def clear_queue(self):
         """Clear pending TTS queue"""
         try:
-            while not self.tts_queue.empty():
-                try:
-                    self.tts_queue.get_nowait()
-                    self.tts_queue.task_done()
-                except queue.Empty:
-                    break
-            print("[TTS] Queue cleared")
+            self.tts_queue.clear()
+            if not self._speaking:
+                self._completion_event.set()
+            if self._debug:
+                print("[TTS] Queue cleared")
         except Exception as e:
             print(f"[TTS] Queue clear error: {e}")
     
@@ -622,12 +1185,12 @@ class TTSEngine:
         """Get engine information for status display"""
         return {
             "engine_type": "Windows SAPI" if self.engine else "none",
-            "enabled": self.config.get("enabled", True),
+            "enabled": self._enabled,
             "running": self.is_running,
             "speaking": self.is_speaking(),
             "voices_available": len(self.available_voices),
             "queue_size": self.tts_queue.qsize(),
-            "stats": self._queue_stats.copy(),
+            "stats": {"processed": self._n_processed, "dropped": self._n_dropped, "errors": self._n_errors},
             "current_voice": (
                 self.available_voices[self.current_voice_index]["name"]
                 if self.available_voices and 0 <= self.current_voice_index < len(self.available_voices)
@@ -4,13 +4,49 @@
 """
 Run this script after building to verify all critical components are included.
 Usage: python verify_build.py
+
+Each call runs every check afresh. Callers that invoke main() repeatedly in
+one process can pass use_cache=True to replay earlier results and output.
 """
 
+import importlib.util
+import io
+import mmap
 import os
+import re
+import shutil
 import sys
+import threading
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# VAD asset references looked for in the generated spec (one pass over the bytes)
+_SPEC_RE = re.compile(rb'faster_whisper/assets|silero_vad')
+
+class _CheckOutput(threading.local):
+    """Per-thread capture buffer for the output of a running check"""
+    buffer = None
+
+_check_output = _CheckOutput()
+
+# check function -> (result, captured output) of its last run, for main(use_cache=True)
+_check_cache = {}
+
+class _RoutedStdout:
+    """sys.stdout stand-in that sends prints from check threads to their own buffer"""
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, text):
+        return (_check_output.buffer or self._stream).write(text)
+    
+    def flush(self):
+        (_check_output.buffer or self._stream).flush()
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
 def check_exe_exists():
     """Check if the executable was created"""
     exe_path = Path("dist/VoiceControl.exe")
@@ -31,9 +67,14 @@ def check_external_files():
         "NTU.PNG"
     ]
     
+    # One directory listing instead of a stat() per file; normcase keeps the
+    # lookup case-insensitive on Windows like Path.exists()
+    with os.scandir('.') as it:
+        existing = {os.path.normcase(entry.name) for entry in it}
+    
     all_exist = True
     for filename in files_to_check:
-        if Path(filename).exists():
+        if os.path.normcase(filename) in existing:
             print(f"✅ Config file exists: {filename}")
         else:
             print(f"⚠️  Config file missing (will be created on first run): {filename}")
@@ -44,7 +85,11 @@ def check_local_models():
     """Check if local models directory exists"""
     models_dir = Path("local_models")
     if models_dir.exists():
-        model_folders = list(models_dir.glob("models--Systran--faster-whisper-*"))
+        with os.scandir(models_dir) as it:
+            model_folders = [
+                entry for entry in it
+                if entry.name.startswith("models--Systran--faster-whisper-") and entry.is_dir()
+            ]
         if model_folders:
             print(f"✅ Local models found: {len(model_folders)} model(s)")
             for folder in model_folders:
@@ -59,8 +104,9 @@ def check_local_models():
 
 def check_vad_model_in_exe():
     """Try to verify VAD model is bundled (requires PyInstaller archive tool)"""
-    try:
-        import PyInstaller.utils.cliutils.archive_viewer as av
+    # find_spec only locates the packages; importing faster_whisper would load
+    # ctranslate2/onnxruntime just to resolve a path
+    if importlib.util.find_spec("PyInstaller") is not None:
         print("\n🔍 Checking VAD model inclusion...")
         print("   (This requires manual inspection of the spec file)")
         print("   The build script should have included:")
@@ -68,8 +114,10 @@ def check_vad_model_in_exe():
         
         # Just verify the source exists
         try:
-            import faster_whisper
-            fw_path = Path(faster_whisper.__file__).parent
+            spec = importlib.util.find_spec("faster_whisper")
+            if spec is None or not spec.submodule_search_locations:
+                raise ImportError("No module named 'faster_whisper'")
+            fw_path = Path(spec.submodule_search_locations[0])
             vad_model = fw_path / "assets" / "silero_vad_v6.onnx"
             if vad_model.exists():
                 print(f"✅ Source VAD model found: {vad_model}")
@@ -83,7 +131,7 @@ def check_vad_model_in_exe():
             print(f"⚠️  Could not locate faster-whisper: {e}")
             return False
             
-    except ImportError:
+    else:
         print("⚠️  PyInstaller archive viewer not available for deep inspection")
         return True
 
@@ -112,13 +160,16 @@ def check_spec_file():
     if spec_path.exists():
         print(f"✅ Spec file exists: {spec_path}")
         
-        # Check if VAD model is mentioned
-        with open(spec_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            if 'faster_whisper/assets' in content or 'silero_vad' in content:
-                print("   ✅ VAD assets mentioned in spec file")
-            else:
-                print("   ⚠️  VAD assets not explicitly mentioned (may rely on auto-detection)")
+        # Check if VAD model is mentioned (scan the mapped bytes, no decode)
+        found = False
+        with open(spec_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:  # mmap rejects empty files
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    found = _SPEC_RE.search(mm) is not None
+        if found:
+            print("   ✅ VAD assets mentioned in spec file")
+        else:
+            print("   ⚠️  VAD assets not explicitly mentioned (may rely on auto-detection)")
         
         return True
     else:
@@ -131,14 +182,30 @@ def check_verification_report():
     if report_path.exists():
         print(f"✅ Verification report exists: {report_path}")
         print("\n📋 Report contents:")
+        # Stream in chunks rather than building the whole report as one string
         with open(report_path, 'r', encoding='utf-8') as f:
-            print(f.read())
+            shutil.copyfileobj(f, sys.stdout)
+        print()
         return True
     else:
         print(f"⚠️  Verification report not found: {report_path}")
         return False
 
-def main():
+def main(use_cache=False):
+    # The whole report is collected in memory and written to the console in
+    # a single call instead of one write per print()
+    stdout = sys.stdout
+    sys.stdout = _RoutedStdout(stdout)
+    _check_output.buffer = report = io.StringIO()
+    try:
+        return _verify(use_cache)
+    finally:
+        _check_output.buffer = None
+        sys.stdout = stdout
+        stdout.write(report.getvalue())
+        stdout.flush()
+
+def _verify(use_cache):
     print("=" * 70)
     print("Voice Control Build Verification")
     print("=" * 70)
@@ -154,17 +221,36 @@ def main():
         ("Verification Report", check_verification_report),
     ]
     
-    results = []
-    for name, check_func in checks:
-        print(f"\n{'─' * 70}")
-        print(f"Checking: {name}")
-        print(f"{'─' * 70}")
+    # Checks are independent and mostly I/O or import bound, so they run
+    # concurrently; each one's output is buffered and printed in list order
+    def run_check(check):
+        name, check_func = check
+        if use_cache and check_func in _check_cache:
+            result, output = _check_cache[check_func]
+            return name, result, output
+        _check_output.buffer = io.StringIO()
         try:
-            result = check_func()
-            results.append((name, result))
-        except Exception as e:
-            print(f"❌ Check failed with error: {e}")
-            results.append((name, False))
+            print(f"\n{'─' * 70}")
+            print(f"Checking: {name}")
+            print(f"{'─' * 70}")
+            try:
+                result = check_func()
+            except Exception as e:
+                print(f"❌ Check failed with error: {e}")
+                result = False
+            output = _check_output.buffer.getvalue()
+            _check_cache[check_func] = (result, output)
+            return name, result, output
+        finally:
+            _check_output.buffer = None
+    
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        outcomes = list(executor.map(run_check, checks))
+    
+    results = []
+    for name, result, output in outcomes:
+        sys.stdout.write(output)
+        results.append((name, result))
     
     # Summary
     print("\n" + "=" * 70)